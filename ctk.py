@@ -19,6 +19,18 @@
 
 import re
 import string
+from collections.abc import Mapping
+from enum import IntEnum
+from functools import lru_cache
+from itertools import repeat
+from types import MappingProxyType
+
+# Google's RE2 engine, which matches in linear time, can optionally be used
+# for the Max constraint patterns (see GENERIC_MAX) if it is installed
+try:
+    import re2
+except ImportError:
+    re2 = None
 
 
 
@@ -44,6 +56,41 @@ coda_pattern = "[Cptkmnjw]g?"
 VOWELS = ["aa", "a", "e", "i", "o", "oe", "eo", "u", "yu", "V"]
 vowel_pattern = "[Vaeo]+|yu|[iu]"
 
+# Set versions of the classes above, for fast membership tests
+OBSTRUENT_SET = frozenset(OBSTRUENTS)
+GEN_OBST_SET = frozenset(GENERAL_OBST)
+CONS_SET = frozenset(CONSONANTS)
+CODA_SET = frozenset(CODAS)
+VOWEL_SET = frozenset(VOWELS)
+NASAL_SET = frozenset(["m", "n", "ng"])
+ONSET_CLUSTER_SET = frozenset(GENERAL_OBST + ["l", "j", "w", "C"])
+VOCALIC_SET = frozenset(VOWELS + ["j", "w"])
+NUCLEUS_SET = frozenset(VOWELS + ["ng", "m", "n", "l", "j", "w"])
+BLANK_SET = frozenset(["", " "])
+
+# Characters used to mark epenthetic segments in candidates
+EPENTH_CHARS = frozenset("CVTSR")
+
+# Epenthetic consonants for each kind of constraint set; any other kind
+# of constraint set uses the general consonant "C"
+EPENTH_CONSONANTS = {"trigram": ("T", "S", "R")}
+
+# Characters that can start and continue a consonant in cons_pattern
+CONS_START_CHARS = frozenset("Cbpdtgkmnfsczhljw")
+CONS_END_CHARS = frozenset("wg")
+
+# Precompile the patterns used by the syllable parser and componifier
+NUCLEUS_RE = re.compile("([aeo]+|[iumljw]|yu|ng?)|V|$")
+ONSET_SPLIT_RE = re.compile("ng?|[kg]w?|[Cbpdtmfsczhljw]")
+
+# Parse onset, nucleus, and coda in a single match. The onset is captured
+# inside a lookahead so that, like _extract_onset, it never gives back
+# consonants to the nucleus; syllables without a licit nucleus right after
+# the onset do not match and are left to the step-by-step parser.
+SYLLABLE_RE = re.compile("(?=(?P<onset>(?:{0})*))(?P=onset)"
+                         "(?P<nucleus>[aeo]+|[iumljw]|yu|ng?|V)"
+                         "(?P<coda>.*)".format(cons_pattern))
+
 # Set up interesting contexts for use in the Dep constraints
 def post_consonant(char):
     """Returns a string with the appropriate post-consonantal environment."""
@@ -77,7 +124,7 @@ class CharacterError(Exception):
 def check_onset(onset, verbose=False):
     """Takes a hypothesized onset and makes sure it is a consonant or the empty string.
     If verbose is True, displays a warning to the user."""
-    if onset == "" or onset in CONSONANTS:
+    if onset == "" or onset in CONS_SET:
         return onset
     else:
         if verbose:
@@ -87,7 +134,7 @@ def check_onset(onset, verbose=False):
 def check_vowel(vowel, verbose=False):
     """Takes a hypothesized vowel and makes sure it is a vowel or syllabic sonorant.
     If verbose is True, displays a warning to the user."""
-    if vowel in VOWELS or vowel in ["m", "n", "ng"]:
+    if vowel in VOWEL_SET or vowel in NASAL_SET:
         return vowel
     else:
         if verbose:
@@ -97,7 +144,7 @@ def check_vowel(vowel, verbose=False):
 def check_coda(coda, verbose=False):
     """Takes a hypothesized coda and makes sure it is a licit coda segment.
     If verbose is True, displays a warning to the user."""
-    if coda == "" or coda in CODAS:
+    if coda == "" or coda in CODA_SET:
         return coda
     else:
         if verbose:
@@ -114,69 +161,78 @@ def check_tone(tone, verbose=False):
             print( "WARNING: Tone cannot be %s." % (tone) )
         raise CharacterError
 
-# Make a function to partition a syllable into onset, nucleus, and coda
-def split_syllable(sigma, warning=False, verbose=False):
-    """Takes a string representing a syllable and returns a tuple of substrings
-    of the form ('onset', 'nucleus', 'coda', 'tone'). If warning is True, runs
-    the check functions on the result before returning to the user. If verbose
-    is True, displays which forms are ruled out by the checking functions."""
+# Make a function to find the group of all consonants at the front of a
+# syllable, scanning for repeated matches of cons_pattern
+def _extract_onset(segments):
+    """Takes a string of segments and returns the longest prefix made up of
+    consonants, where each consonant is one of the characters in
+    CONS_START_CHARS optionally followed by one in CONS_END_CHARS."""
+    i = 0
+    n = len(segments)
+    while i < n and segments[i] in CONS_START_CHARS:
+        i += 1
+        if i < n and segments[i] in CONS_END_CHARS:
+            i += 1
+    return segments[:i]
+
+# Make a function to partition the segments of a syllable (without its tone)
+# into onset, nucleus, and coda. Since many syllables differ only in their
+# tone, this is cached separately from split_syllable
+@lru_cache(maxsize=16384)
+def _split_core(segments):
+    """Takes a string of segments representing a syllable without its tone,
+    and returns a tuple of substrings of the form ('onset', 'nucleus', 'coda')."""
     # Set defaults
-    onset = ""; nucleus = ""; coda = ""; tone = ""
+    onset = ""; nucleus = ""; coda = ""
+
+    # If it's a single member syllable, store the segment as the nucleus
+    if (segments in CONS_SET) or (segments in VOWEL_SET):
+        nucleus = segments
+
+    # Otherwise, if it's not a recognized consonant or vowel, store it as
+    # a nucleus for the purposes of checking
+    elif len(segments) == 1:
+        nucleus = segments
+
+    # Otherwise, if it's a two-segment word, split into vowels and consonants
+    elif len(segments) == 2:
+        # If the first segment is a consonant...
+        if segments[0] in ONSET_CLUSTER_SET:
+            # ...store it as the onset
+            onset = segments[0]
+            # Then, if the second segment is an obstruent...
+            if segments[1] in GEN_OBST_SET:
+                # ... store it as the coda
+                coda = segments[1]
+            # Otherwise, store it as the nucleus
+            else:
+                nucleus = segments[1]
 
-    if sigma in ["", " "]:
-        return (onset, nucleus, coda, tone)
+        # If the first segment is a nasal and it's followed by a vocalic
+        # segment...
+        elif segments[0] in NASAL_SET and segments[1] in VOCALIC_SET:
+            # ... the nasal is the onset and the vowel is the nucleus
+            onset = segments[0]; nucleus = segments[1]
 
-    try:
-        # Begin by parsing the tone, if there is one
-        if sigma[-1].isdigit():
-            tone = sigma[-1]
-            # Peel off tone to work with segments only
-            segments = sigma[:-1]
-        # Otherwise, proceed as usual
+        # Otherwise, assume the syllable consists of a nucleus and a coda
         else:
-            segments = sigma
+            nucleus = segments[0]; coda = segments[1]
 
-        # If it's a single member syllable, store the segment as the nucleus
-        if (segments in CONSONANTS) or (segments in VOWELS):
-            nucleus = segments
-
-        # Otherwise, if it's not a recognized consonant or vowel, store it as
-        # a nucleus for the purposes of checking
-        elif len(segments) == 1:
-            nucleus = segments
-
-        # Otherwise, if it's a two-segment word, split into vowels and consonants
-        elif len(segments) == 2:
-            # If the first segment is a consonant...
-            if segments[0] in (OBSTRUENTS + SIBILANTS + ["l", "j", "w", "C"]):
-                # ...store it as the onset
-                onset = segments[0]
-                # Then, if the second segment is an obstruent...
-                if segments[1] in OBSTRUENTS + SIBILANTS:
-                    # ... store it as the coda
-                    coda = segments[1]
-                # Otherwise, store it as the nucleus
-                else:
-                    nucleus = segments[1]
-
-            # If the first segment is a nasal and it's followed by a vocalic
-            # segment...
-            elif segments[0] in ["m", "n", "ng"] and segments[1] in VOWELS + ["j", "w"]:
-                # ... the nasal is the onset and the vowel is the nucleus
-                onset = segments[0]; nucleus = segments[1]
-
-            # Otherwise, assume the syllable consists of a nucleus and a coda
-            else:
-                nucleus = segments[0]; coda = segments[1]
+    # Otherwise, use regular expressions to parse the syllable
+    elif len(segments) > 2:
+        # Try to parse the whole syllable in one pass
+        parse = SYLLABLE_RE.match(segments)
+        if parse:
+            onset, nucleus, coda = parse.group("onset", "nucleus", "coda")
 
-        # Otherwise, use regular expressions to parse the syllable
-        elif len(segments) > 2:
+        # Otherwise, parse it step by step
+        else:
             # First, find the group of all consonants at the front of the syllable
-            onset = re.search("^({0})*".format(cons_pattern), segments).group()
+            onset = _extract_onset(segments)
             x = len(onset)
 
             # Next, scan the rest of the string for the first licit nucleus
-            nucleus = re.search("([aeo]+|[iumljw]|yu|ng?)|V|$", segments[x:]).group()
+            nucleus = NUCLEUS_RE.search(segments, x).group()
             y = x + len(nucleus)
 
             # If there are no more segments in the string after these two
@@ -200,9 +256,39 @@ def split_syllable(sigma, warning=False, verbose=False):
 
             # Quick fix #2 -- if there's only a nasal onset and coda left,
             # reparse as a nucleus
-            if onset in ["m", "ng", "n"] and nucleus == "":
+            if onset in NASAL_SET and nucleus == "":
                 nucleus = onset; onset = ""
 
+    return (onset, nucleus, coda)
+
+# Make a function to partition a syllable into onset, nucleus, and coda
+# Since the same syllables recur across candidates and tableaux, cache the
+# results of the parse
+@lru_cache(maxsize=16384)
+def split_syllable(sigma, warning=False, verbose=False):
+    """Takes a string representing a syllable and returns a tuple of substrings
+    of the form ('onset', 'nucleus', 'coda', 'tone'). If warning is True, runs
+    the check functions on the result before returning to the user. If verbose
+    is True, displays which forms are ruled out by the checking functions."""
+    # Set defaults
+    onset = ""; nucleus = ""; coda = ""; tone = ""
+
+    if sigma in BLANK_SET:
+        return (onset, nucleus, coda, tone)
+
+    try:
+        # Begin by parsing the tone, if there is one
+        if sigma[-1].isdigit():
+            tone = sigma[-1]
+            # Peel off tone to work with segments only
+            segments = sigma[:-1]
+        # Otherwise, proceed as usual
+        else:
+            segments = sigma
+
+        # Then, split the segments into onset, nucleus, and coda
+        onset, nucleus, coda = _split_core(segments)
+
         # If warning mode is on, check whether the syllable is a licit syllable of
         # Cantonese
         if warning:
@@ -225,26 +311,30 @@ def split_syllable(sigma, warning=False, verbose=False):
 # Make a function to split a list of syllables into a list of all possible
 # subcomponents
 def componify(syll_list):
-    """Takes a list of syllables, already divided into their subcomponents,
-    and returns a list of components, separated by a space."""
+    """Takes a list of syllables, already divided into their subcomponents
+    (either as parsed strings or as tuples of components), and returns a
+    list of components, separated by a space."""
     components = []
     for i in range(len(syll_list)):
         new_components = []
         # Split each syllable into its non-tone components and store in components
-        non_tones = syll_list[i].split(".")[:-1]
+        if isinstance(syll_list[i], str):
+            non_tones = syll_list[i].split(".")[:-1]
+        else:
+            non_tones = syll_list[i][:-1]
         # Ensure that all double-segment onsets are also split
-        if len(non_tones[0]) > 1 and non_tones[0] not in CONSONANTS:
-            new_components.extend(re.findall("ng?|[kg]w?|[Cbpdtmfsczhljw]", non_tones[0]))
+        if len(non_tones[0]) > 1 and non_tones[0] not in CONS_SET:
+            new_components.extend(ONSET_SPLIT_RE.findall(non_tones[0]))
         else:
             new_components.append(non_tones[0])
         # Ensure that all double-segment nuclei are also split
-        if len(non_tones[1]) >1 and non_tones[1] not in VOWELS + ["ng", "m", "n", "l", "j", "w"]:
+        if len(non_tones[1]) >1 and non_tones[1] not in NUCLEUS_SET:
             new_components.extend(re.findall(".", non_tones[1]))
         else:
             new_components.append(non_tones[1])
         # Ensure that all double-segment codas are also split
-        if len(non_tones[2]) > 1 and non_tones[2] not in CONSONANTS:
-            new_components.extend(re.findall("ng?|[kg]w?|[Cbpdtmfsczhljw]", non_tones[2]))
+        if len(non_tones[2]) > 1 and non_tones[2] not in CONS_SET:
+            new_components.extend(ONSET_SPLIT_RE.findall(non_tones[2]))
         else:
              new_components.append(non_tones[2])
         # Add the whole thing to the list of components
@@ -255,27 +345,51 @@ def componify(syll_list):
 
     return components
 
+# Set up bit flags for the classes of components that matter to the
+# re-syllabifier, and a table of the flags for every known component
+TAG_BLANK = 1
+TAG_SPACE = 2
+TAG_VOWEL = 4
+TAG_NUCLEUS = 8
+TAG_CONS = 16
+TAG_OBST = 32
+
+def _component_tag(c):
+    """Takes a component and returns the bit flags of all of its classes."""
+    return ((TAG_BLANK if c in BLANK_SET else 0) |
+            (TAG_SPACE if c == " " else 0) |
+            (TAG_VOWEL if c in VOWEL_SET else 0) |
+            (TAG_NUCLEUS if c in NUCLEUS_SET else 0) |
+            (TAG_CONS if c in CONS_SET else 0) |
+            (TAG_OBST if c in OBSTRUENT_SET else 0))
+
+COMPONENT_TAGS = {c: _component_tag(c) for c in BLANK_SET | VOWEL_SET | NUCLEUS_SET | CONS_SET}
+
+def component_tags(component_list):
+    """Takes a list of components and returns a list of their class tags,
+    with 0 for components that belong to none of the classes."""
+    return [COMPONENT_TAGS.get(c, 0) for c in component_list]
+
 # Make a re-syllabifier for V-epenthesis candidates
-def resyllabify(component_list, k):
+def resyllabify(component_list, k, tags=None):
     """Takes a list of components and the index of the epenthetic vowel
     and modifies the list of components, so that spaces are inserted
-    to reflect new syllable divisions."""
-
-    # First, get the prior context
-    if k-3 >= 0:
-        before = component_list[k-3:k]
-    elif k-2 >= 0:
-        before = component_list[k-2:k]
+    to reflect new syllable divisions. If tags is given, it should be the
+    result of component_tags on the list before the vowel was inserted,
+    so that the tags don't have to be looked up again for every vowel."""
+
+    # First, get the class tags of the prior and following context
+    if tags is None:
+        before = component_tags(component_list[max(k-3, 0):k])
+        after = component_tags(component_list[k+1:k+3])
     else:
-        before = component_list[:k]
-
-    # Next get the following context
-    after = component_list[k+1:k+3]
+        before = tags[max(k-3, 0):k]
+        after = tags[k:k+2]
 
     # If the prior context is empty...
-    if before[-2:] in [[], [""], [" "], ["", ""], [" ", ""], ["", " "], [" ", " "]]:
+    if all(t & TAG_BLANK for t in before[-2:]):
         # ...and the following context is not a consonant cluster...
-        if (after[0] in VOWELS or after[1] in VOWELS + ["j", "w", "l", "m", "n", "ng"]):
+        if (after[0] & TAG_VOWEL or after[1] & TAG_NUCLEUS):
             # ...add a space after the vowel
             component_list[k] += " "
         else:
@@ -283,25 +397,25 @@ def resyllabify(component_list, k):
             component_list[k+1] += " "
 
         # ...and the preceding nucleus is actually an obstruent
-        if len(before) == 3 and before[-3] in OBSTRUENTS:
+        if len(before) == 3 and before[-3] & TAG_OBST:
             # ...delete any spaces between the vowel and the obstruent nucleus
             component_list[k-1] = ""
             component_list[k-2] = ""
 
     # If the prior context is a consonant...
-    elif (before[-1] in CONSONANTS):
+    elif before[-1] & TAG_CONS:
         # ...and if the prior does not have a vowel...
-        if len(before) > 1 and before[-2] in VOWELS:
+        if len(before) > 1 and before[-2] & TAG_VOWEL:
             # ...add a space after that vowel
             component_list[k-2] += " "
         # ... and if the following context is not a vowel, don't add any spaces
-        elif len(after) > 1 and after[0] in CONSONANTS and after[1] not in VOWELS:
+        elif len(after) > 1 and after[0] & TAG_CONS and not after[1] & TAG_VOWEL:
             pass
         else:
             # ...add a space after the vowel
             component_list[k] += " "
     # If the further-away context is a consonant or a coda
-    elif before[-1] == " " and (before[-2] in CONSONANTS):
+    elif before[-1] & TAG_SPACE and before[-2] & TAG_CONS:
         # ... take away the space, if there is one...
         component_list[k-1] = ""
         # ...and add a space before the consonant...
@@ -309,7 +423,7 @@ def resyllabify(component_list, k):
         # ...and add a space after the V
         component_list[k] += " "
     # If the prior context is a vowel...
-    elif before[-1] in VOWELS:
+    elif before[-1] & TAG_VOWEL:
         # ...add the space before the vowel
         component_list[k] = " " + component_list[k]
 
@@ -327,53 +441,57 @@ def GEN_ONE(tableau, const_set):
     # Get a list of all of the syllable components
     components = componify(syllables)
 
+    # Join the components once and note where each one starts, so that the
+    # deletion and consonant epenthesis candidates can be built by slicing
+    joined = "".join(components)
+    offsets = []
+    n = 0
+    for component in components:
+        offsets.append(n)
+        n += len(component)
+
+    # Look up the class tags of the components once for the re-syllabifier
+    tags = component_tags(components)
+
+    # Depending on the kind of constraint set used, pick the consonants to
+    # epenthesize
+    consonants = EPENTH_CONSONANTS.get(const_set, ("C",))
+
     # Add the fully faithful Candidate to the Tableau
-    tableau.add_candidate("".join(components).strip())
+    tableau.add_candidate(joined.strip())
 
     # Get the single deletion Candidates
     for j in range(len(components)):
-        if components[j] not in (" ", ""):
-            components_copy = components[:]
-            deleted = components_copy.pop(j)
-            tableau.add_candidate("".join(components_copy))
+        if components[j] not in BLANK_SET:
+            start = offsets[j]
+            tableau.add_candidate(joined[:start] + joined[start + len(components[j]):])
 
     # Get the single epenthesis candidates, both vowel and consonant
     for k in range(len(components)):
-        if components[k] not in (" ", ""):
+        if components[k] not in BLANK_SET:
             # Add the vowel epenthesis candidate
             components_V = components[:]
             components_V.insert(k, "V")
             # Do some extra work on the V-epenthesis candidates to make
             # sensisble syllable divisions
-            resyllabify(components_V, k)
+            resyllabify(components_V, k, tags)
             # Add the resulting candidate
             tableau.add_candidate("".join(components_V))
 
-            # Depending on the kind of constraint set used, add the consonant
-            # epenthesis forms
-            if const_set == "trigram":
-                components_T = components[:]; components_T.insert(k, "T"); tableau.add_candidate("".join(components_T))
-                components_S = components[:]; components_S.insert(k, "S"); tableau.add_candidate("".join(components_S))
-                components_R = components[:]; components_R.insert(k, "R"); tableau.add_candidate("".join(components_R))
-            else:
-                components_C = components[:]; components_C.insert(k, "C")
-                # Add the C-epenthesis candidates as-is
-                tableau.add_candidate("".join(components_C))
+            # Add the consonant epenthesis candidates as-is
+            before = joined[:offsets[k]]; after = joined[offsets[k]:]
+            for c in consonants:
+                tableau.add_candidate(before + c + after)
 
     # Add the word-final epenthesis candidates
-    if const_set == "trigram":
-        tableau.add_candidate("".join(components + ["T"]))
-        tableau.add_candidate("".join(components + ["S"]))
-        tableau.add_candidate("".join(components + ["R"]))
-    else:
-        tableau.add_candidate("".join(components + ["C"]))
-    if components[-1] in CONSONANTS:
+    for c in consonants:
+        tableau.add_candidate(joined + c)
+    if components[-1] in CONS_SET:
         # Resyllabify the final consonant as an onset, if there is one
-        components[-1] = " " + components[-1]
-        tableau.add_candidate("".join(components + ["V"]))
+        tableau.add_candidate(joined[:offsets[-1]] + " " + components[-1] + "V")
     else:
         # Just treat the final vowel as its own syllable
-        tableau.add_candidate("".join(components + [" V"]))
+        tableau.add_candidate(joined + " V")
 
 # Make a GEN function that takes an entry and returns a list of all of the
 # # possible two-change deletion and epenthesis forms for that entry
@@ -389,38 +507,68 @@ def GEN_TWO(tableau, const_set):
     candidates = tableau.get_candidates()
 
     # Find only the deletion candidates
-    del_candidates = [ x for x in candidates[1:] if ("C" not in x) and ("V" not in x) and ("T" not in x) and ("S" not in x) and ("R" not in x) and x != "" ]
+    del_candidates = [ x for x in candidates[1:] if x and EPENTH_CHARS.isdisjoint(x) ]
     for d in del_candidates:
         # Get the parsed entry for that candidate
-        d_parsed = tableau.get_candidate(d).get_parsed_output().split()
+        d_parsed = tableau.get_candidate(d).get_parsed_syllables()
 
         # Split into components
         components = componify(d_parsed)
 
+        tags = component_tags(components)
+
         # Next, add the Vowel epenthesis candidates
         for k in range(len(components)):
-            if components[k] not in ["", " "]:
+            if components[k] not in BLANK_SET:
                 components_V = components[:]
                 components_V.insert(k, "V")
                 # Run the resyllabifier
-                resyllabify(components_V, k)
+                resyllabify(components_V, k, tags)
                 # add the resulting candidate
                 tableau.add_candidate("".join(components_V))
 
         # Add the word-final epenthesis candidate
-        if components[-1] in CONSONANTS:
+        if components[-1] in CONS_SET:
             # Resyllabify as an onset
-            components[-1] = " " + components[-1]
-            tableau.add_candidate("".join(components + ["V"]))
-        elif components[-1] in ["", " "] and components[-2] in CONSONANTS:
+            tableau.add_candidate("".join(components[:-1]) + " " + components[-1] + "V")
+        elif components[-1] in BLANK_SET and components[-2] in CONS_SET:
             components[-2] = " " + components[-2]
         else:
             # Treat the final vowel as its own syllable
-            tableau.add_candidate("".join(components + [" V"]))
+            tableau.add_candidate("".join(components) + " V")
 
 
 
 # ---------- 3. Eval function ----------------------------------------------- #
+# Make a function for each way of applying a Constraint function to all of
+# the Candidates of a Tableau, given the Tableau's input and the Candidates'
+# unparsed outputs, parsed outputs and parsed syllables
+def _apply_parsed(func, inp, outputs, parsed_outputs, syllables):
+    """Applies func to the parsed output of each Candidate, or to its already
+    split syllables if func is marked as accepting them."""
+    if getattr(func, "accepts_syllables", False):
+        return map(func, syllables)
+    return map(func, parsed_outputs)
+
+def _apply_output(func, inp, outputs, parsed_outputs, syllables):
+    """Applies func to the unparsed output of each Candidate."""
+    return map(func, outputs)
+
+def _apply_input_output(func, inp, outputs, parsed_outputs, syllables):
+    """Applies func to the unparsed input of the Tableau and the unparsed
+    output of each Candidate."""
+    return map(func, repeat(inp), outputs)
+
+# Which of the above to use for each ConstraintType, indexed by its value
+_EVAL_DISPATCH = (
+    _apply_parsed,          # Markedness
+    _apply_parsed,          # Prosodic
+    _apply_output,          # Phonotactic
+    _apply_parsed,          # Faithfulness
+    _apply_input_output,    # Max
+    _apply_output,          # Dep
+)
+
 # Make an EVAL function that takes a Tableau object and applies each
 # Constraint in its constraint list to each of its Candidates, storing it in
 # each Candidate's list of violations.
@@ -429,31 +577,27 @@ def EVAL(tableau):
     of its Candidates, storing the results in the Candidate's violation list."""
     # First, get the list of Constraints
     const_names = tableau.get_constraints()
-    # And the list of Candidates
-    cand_names = tableau.get_candidates()
+    # And the list of Candidates, along with their output forms
+    cands = tableau._cand_list
+    outputs = [c.get_output() for c in cands]
+    parsed_outputs = [c.get_parsed_output() for c in cands]
+    syllables = [c.get_parsed_syllables() for c in cands]
 
     for const in const_names:
         # Get the Constraint object itself
         f = tableau.get_constraint(const)
 
-        # Loop through the Candidates and apply the constraint
-        for cand in cand_names:
-            # Get the Candidate itself
-            c = tableau.get_candidate(cand)
-
-            # Apply the Constraint to the candidate, depending on its type
-            if f.get_type() in ["Dep", "Phonotactic"]:
-                # Use the unparsed output form of the Candidate
-                v = f.func(c.get_output())
-            elif f.get_type() == "Max":
-                # Use both the parsed input of the Tableau and the parsed ouptut
-                # of the Candidate
-                v = f.func(tableau.get_input(), c.get_output())
-            else:
-                # Use the parsed output of the Candidate
-                v = f.func(c.get_parsed_output())
+        # Apply the Constraint to all of the Candidates in one pass,
+        # depending on its type; Constraints of an unrecognized type use the
+        # parsed outputs
+        if f.type is None:
+            apply = _apply_parsed
+        else:
+            apply = _EVAL_DISPATCH[f.type]
+        vios = apply(f.func, tableau.get_input(), outputs, parsed_outputs, syllables)
 
-            # Add the violation to the Candidate
+        # Add the violations to the Candidates
+        for c, v in zip(cands, vios):
             c.add_violation(v)
 
 
@@ -462,22 +606,26 @@ def EVAL(tableau):
 # ---------- 4. Candidate handling ------------------------------------------ #
 # Candidate object
 class Candidate():
-    def __init__(self, out, win=0, vios=[]):
+    def __init__(self, out, win=0, vios=None, syl_cache=None):
         """Initialization function for a Candidate object.
         Takes an output string, a value representing its output probability,
         and a list of violations, and stores them to the Candidate as output,
         freq, and violations, respectively.
         The default value for freq is 0, and the default value for vios is
-        the empty set.
+        None, which gives the Candidate its own empty list of violations.
         Parses the output into its sub-syllabic consituents and stores it
-        as parsed_output."""
+        as parsed_output, keeping the tuple of parsed syllables as well.
+        If syl_cache is given, it should be a dictionary of already parsed
+        syllables (such as those of a Tableau's input), which are used
+        instead of parsing those syllables again."""
         self.output = out
-        components = ""
-        for sigma in out.split():
-            components += (".".join(list(split_syllable(sigma))) + " ")
-        self.parsed_output = components.strip()
+        if syl_cache is None:
+            syl_cache = {}
+        self._parsed_syllables = tuple(syl_cache.get(sigma) or split_syllable(sigma)
+                                       for sigma in out.split())
+        self.parsed_output = " ".join(".".join(x) for x in self._parsed_syllables)
         self.freq = win
-        self.violations = vios
+        self.violations = [] if vios is None else list(vios)
 
     def __repr__(self):
         return "Candidate '{0}'".format(self.output)
@@ -490,24 +638,23 @@ class Candidate():
         """Returns the parsed output attribute of the Candidate."""
         return self.parsed_output
 
+    def get_parsed_syllables(self):
+        """Returns the parsed output of the Candidate as a tuple of
+        (onset, nucleus, coda, tone) tuples, one per syllable."""
+        return self._parsed_syllables
+
     def get_freq(self):
         """Returns the frequency attribute of the Candidate."""
         return self.freq
 
     def get_violations(self):
-        """Returns a copy of the violation attribute of the Candidate."""
+        """Returns a copy of the violation attribute of the Candidate, which
+        is safe to modify without affecting the Candidate."""
         return self.violations[:]
 
     def add_violation(self, x):
         """Adds a value to the violation attribute of the Candidate."""
-        # NOTE: I had to make it this clunky, because if I tried to access
-        # an empty violations attribute directly, the script treated all
-        # instances of the empty set created by GEN as identical,
-        # and appending x to the violation profile of any candidate led
-        # to appending x to the violation profile of every candidate.
-        old_vios = self.get_violations()
-        old_vios.append(x)
-        self.violations = old_vios
+        self.violations.append(x)
 
     def add_freq(self, n=1):
         """Adds n to the Candidate's frequency attribute.
@@ -519,23 +666,31 @@ class Candidate():
 # ---------- 5. Tableau handling -------------------------------------------- #
 # Tableau object
 class Tableau():
-    def __init__(self, inp, constraints={}):
+    def __init__(self, inp, constraints=None):
         """"Initialization function for a Tableau object.
-        Takes an input string and dictionary of Constraints and stores them to
+        Takes an input string and a ConstraintSet and stores them to
         the Tableau as input and constraints, respectivley, along with an
         inclusion parapmeter, set to False by default; and an empty dictionary
-        for storing Candidates.
+        and list for looking up and iterating over Candidates.
         Parses the input into its sub-syllabic constituents and stores it as
         parsed_input.
+        A ConstraintSet is shared by reference, so that many Tableaux can use
+        the same one. A dictionary of Constraints is shared by reference too,
+        by wrapping it in a ConstraintSet without copying it; if nothing is
+        passed, the Tableau gets an empty ConstraintSet of its own.
         """
         self.input = inp
-        components = ""
-        for sigma in inp.split():
-            components += (".".join(list(split_syllable(sigma))) + " ")
-        self.parsed_input = components.strip()
-        self.constraints = constraints
+        # Parse each syllable of the input once, and keep the parses to share
+        # with the Candidates
+        self._syl_cache = {sigma: split_syllable(sigma) for sigma in set(inp.split())}
+        self.parsed_input = " ".join(".".join(self._syl_cache[sigma]) for sigma in inp.split())
+        if isinstance(constraints, ConstraintSet):
+            self.constraints = constraints
+        else:
+            self.constraints = ConstraintSet(constraints)
         self.incl = False
         self.cands = {}
+        self._cand_list = []
 
     def __repr__(self):
         return "Tableau '{0}' with {1} candidates".format(self.input, len(self.cands))
@@ -551,22 +706,17 @@ class Tableau():
     def get_constraints(self):
         """Returns a lis of the Constraint names in the constraints attribute of
         the Tableau."""
-        return list(self.constraints)
+        return self.constraints.get_constraints()
 
     def get_constraint(self, const_name):
-        """Goven the name of a Constraint, retrieves it from the dictionary.
-        If it does not exist, prints a warning and does nothing."""
-        try:
-            return self.constraints[const_name]
-        except KeyError:
-            print("WARNING: Tableau does not have a constraint '{0}'.".format(const_name))
+        """Goven the name of a Constraint, retrieves it from the Tableau's
+        ConstraintSet. If it does not exist, prints a warning and does nothing."""
+        return self.constraints.get_constraint(const_name)
 
     def add_constraint(self, name, kind, function=lambda x: 0, desc=None):
-        """If there is no Constraint already present in the Constraint dictionary,
-        adds a Constraint to the Tableau object, referred to by its name."""
-        new_constraint = Constraint(name, kind, function, desc)
-        if new_constraint not in self.get_constraints():
-            self.constraints[new_constraint.get_name()] = new_constraint
+        """Adds a Constraint to the Tableau's ConstraintSet, referred to by its
+        name. Any other Tableaux sharing the ConstraintSet will see it too."""
+        self.constraints.add_constraint(name, kind, function, desc)
 
     def get_candidates(self):
         """Returns a list of Candidate names of the Tableau, by order of insertion."""
@@ -580,25 +730,20 @@ class Tableau():
         except KeyError:
             print("WARNING: Tableau does not have a candidate '{0}'.".format(cand_name))
 
-    def add_candidate(self, out, win=0, vios=[]):
+    def add_candidate(self, out, win=0, vios=None):
         """If there is no candidate already present in the candidate ditionary,
         Adds a Candidate to the Tableau object, referred to by its
         out(put) value."""
-        new_candidate = Candidate(out, win, vios)
-        if new_candidate not in self.get_candidates():
-            self.cands[new_candidate.get_output()] = new_candidate
+        if out not in self.cands:
+            new_candidate = Candidate(out, win, vios, self._syl_cache)
+            self.cands[out] = new_candidate
+            self._cand_list.append(new_candidate)
 
     def vios(self):
         """Returns a list of lists of violation profiles.
         Each violation profile will begin with its probability value, followed by
         the list of constraint violations."""
-        profile = []
-        for cand in self.get_candidates():
-            c = self.get_candidate(cand)
-            violine = c.get_violations()
-            violine.insert(0, c.get_freq())
-            profile.append(violine)
-        return profile
+        return [[c.freq, *c.violations] for c in self._cand_list]
 
     def include(self, value=None):
         """Allows the user to change the inclusion parameter of the Tableau.
@@ -622,14 +767,11 @@ class Tableau():
         else:
             ur = self.get_input()
 
-        # Set up the block of text to be returned
-        ur_block = ""
+        # Set up the lines of text to be returned
+        lines = []
 
         # Then loop through candidates
-        for cand in self.get_candidates():
-            # Get the candidate of interest
-            c = self.get_candidate(cand)
-
+        for c in self._cand_list:
             # Set up the output
             if parsed:
                 sr = c.get_parsed_output()
@@ -637,17 +779,27 @@ class Tableau():
                 sr = c.get_output()
 
             # Set up the output line
-            line = [ur, sr, str(c.get_freq())] + [ str(x) for x in c.get_violations() ]
+            line = [ur, sr, f"{c.freq}"] + [ str(x) for x in c.violations ]
 
-            # Add line to block
-            ur_block += ("\t".join(line) + "\n")
+            # Add line to the list of lines
+            lines.append("\t".join(line))
 
-        # Return the block text
-        return ur_block
+        # Return the block text, with each line ending in a newline
+        lines.append("")
+        return "\n".join(lines)
 
 
 
 # ----------- 6. Constraint handling ---------------------------------------- #
+# Kinds of Constraint, numbered so that EVAL can look up how to apply each one
+class ConstraintType(IntEnum):
+    Markedness = 0
+    Prosodic = 1
+    Phonotactic = 2
+    Faithfulness = 3
+    Max = 4
+    Dep = 5
+
 # Constraint object
 class Constraint():
     def __init__(self, name, kind, function=lambda x: 0, desc=None):
@@ -656,10 +808,14 @@ class Constraint():
         of its intended purpose, and the kind of the function, as well as the
         evaluation function for the constraint. Stores all variables internally
         as name, description, type, and func, respectively.
+        The kind may be given either as a string or as a ConstraintType, and
+        is stored as a ConstraintType.
         Function will default to returning only 0."""
         self.name = name
-        if kind in ["Markedness", "Prosodic", "Phonotactic", "Faithfulness", "Max", "Dep"]:
+        if isinstance(kind, ConstraintType):
             self.type = kind
+        elif kind in ConstraintType.__members__:
+            self.type = ConstraintType[kind]
         else:
             print("WARNING: {0} is not a recognized type for Constraint.".format(kind))
             print("         Constraint must be 'Markedness', 'Prosodic', 'Phonotactic',")
@@ -669,15 +825,16 @@ class Constraint():
         self.func = function
 
     def __repr__(self):
-        return "{1} Constraint '{0}'".format(self.name, self.type)
+        return "{1} Constraint '{0}'".format(self.name, self.get_type())
 
     def get_name(self):
         """Returns the name attribute of the Constraint."""
         return self.name
 
     def get_type(self):
-        """Returns the type or kind of the Constraint."""
-        return self.type
+        """Returns the type or kind of the Constraint, as a string."""
+        if self.type is not None:
+            return self.type.name
 
     def get_description(self):
         """Returns the descriptive text for the Constraint, if present"""
@@ -686,6 +843,76 @@ class Constraint():
         else:
             print("Constraint '{0}' has no descriptive text.".format(self.name))
 
+# ConstraintSet object
+class ConstraintSet(Mapping):
+    def __init__(self, constraints=None):
+        """Initialization function for a ConstraintSet object.
+        Takes a dictionary of Constraints, keyed by name, and keeps it by
+        reference rather than copying it, so that Constraints added through
+        the set also show up in the dictionary, and the other way around.
+        The dictionary is exposed read-only as constraints, and the set can
+        itself be read like a dictionary (with keys(), items(), get(), etc.)."""
+        self._constraints = {} if constraints is None else constraints
+        self.constraints = MappingProxyType(self._constraints)
+
+    def __repr__(self):
+        return "ConstraintSet with {0} constraints".format(len(self._constraints))
+
+    def __getitem__(self, const_name):
+        return self._constraints[const_name]
+
+    def __iter__(self):
+        return iter(self._constraints)
+
+    def __len__(self):
+        return len(self._constraints)
+
+    def __contains__(self, const_name):
+        return const_name in self._constraints
+
+    def get_constraints(self):
+        """Returns a list of the Constraint names in the set, by order of
+        insertion."""
+        return list(self._constraints)
+
+    def get_constraint(self, const_name):
+        """Given the name of a Constraint, retrieves it from the set.
+        If it does not exist, prints a warning and does nothing."""
+        try:
+            return self._constraints[const_name]
+        except KeyError:
+            print("WARNING: ConstraintSet does not have a constraint '{0}'.".format(const_name))
+
+    def add_constraint(self, name, kind, function=lambda x: 0, desc=None):
+        """Adds a Constraint to the set, referred to by its name. A Constraint
+        already stored under that name is replaced."""
+        self._constraints[name] = Constraint(name, kind, function, desc)
+
+# Make a helper for spotting regex patterns that only match themselves
+def _is_literal(pattern):
+    """Takes a regex pattern and returns True if it contains no special
+    characters, so that its matches can be counted with str.count."""
+    return isinstance(pattern, str) and re.escape(pattern) == pattern
+
+# Make a helper for compiling patterns, with RE2 where asked to
+# Keep each compiled pattern, so that constraints built from the same pattern
+# share it
+@lru_cache(maxsize=None)
+def _compile_pattern(pattern, use_re2=False):
+    """Takes a regex pattern and compiles it with re. If use_re2 is True
+    (which should only be the case when RE2 is installed), the pattern is
+    compiled with RE2 instead, as long as RE2 supports the pattern."""
+    if use_re2:
+        # Don't have RE2 log the patterns it rejects, since those just fall
+        # back to re
+        options = re2.Options()
+        options.log_errors = False
+        try:
+            return re2.compile(pattern, options)
+        except re2.error:
+            pass
+    return re.compile(pattern)
+
 # Generic function for checking presence/absence/quality of syllable components
 def COMPONENT_CHECK(index, condition_list, ban=True):
     """Takes a list representing the indices of the components to be checked
@@ -694,19 +921,37 @@ def COMPONENT_CHECK(index, condition_list, ban=True):
     string and return the number of violations of the condition established.
     If ban is True, the condition_list is treated as a ban on that list of
     segments. If ban is False, the condition_list is treated as a requirement
-    for that position."""
+    for that position.
+    The returned function also accepts a sequence of already-split
+    syllables, such as the result of Candidate.get_parsed_syllables(), and
+    is marked with accepts_syllables so that EVAL passes it those."""
+    # A parsed syllable has four components (onset, nucleus, coda and tone),
+    # so catch indices outside of those here rather than when applying it
+    for i in index:
+        if not -4 <= i < 4:
+            raise IndexError("Component index {0} is out of range for a syllable of 4 components.".format(i))
+    conditions = frozenset(condition_list)
+    index = tuple(index)
+
     def F(output):
         check = 0
-        for sigma in output.split():
-            components = sigma.split(".")
-            for i in index:
-                if ban:
-                    if components[i] in condition_list:
-                        check += 1
-                else:
-                    if components[i] not in condition_list:
+        # Split each syllable into its components and check them
+        if isinstance(output, str):
+            for sigma in output.split():
+                components = sigma.split(".")
+                for i in index:
+                    if (components[i] in conditions) == ban:
                         check += 1
+            return check
+
+        # If the syllables have already been split, check their components
+        # directly
+        for components in output:
+            for i in index:
+                if (components[i] in conditions) == ban:
+                    check += 1
         return check
+    F.accepts_syllables = True
     return F
 
 # Generic function for establishing phonotactic restrictions
@@ -715,8 +960,15 @@ def PHONOTACTIC(pattern):
     phonotactic restriction, and returns a function that will count
     the number of times that pattern occurs in an unparsed output
     string."""
+    # Count literal patterns directly, without going through the regex engine
+    if _is_literal(pattern):
+        def F(output):
+            return output.count(pattern)
+        return F
+
+    compiled = re.compile(pattern)
     def F(output):
-        return len(re.findall(pattern, output))
+        return len(compiled.findall(output))
     return F
 
 # Generic function for establishing Dep constraints
@@ -733,49 +985,130 @@ def GENERIC_DEP(lenv, renv, segment):
         search_string = lenv(segment)
     else:
         search_string = lenv(renv(segment))
+    compiled = re.compile(search_string)
     # Define the function
     def F(output):
-        return len(re.findall(search_string, output))
+        return len(compiled.findall(output))
     return F
 
+# Max constraints over the same class of segments count that class in the
+# same inputs and outputs, so share the counts between them
+@lru_cache(maxsize=65536)
+def _count_segments(pattern, s):
+    """Takes a compiled regex pattern and a string, and returns the number
+    of times the pattern occurs in the string."""
+    return len(pattern.findall(s))
+
 # Generic function for establishing Max contraints
-def GENERIC_MAX(segment_pattern, lenv=None, renv=None):
+def GENERIC_MAX(segment_pattern, lenv=None, renv=None, use_re2=False):
     """Takes the regex pattern for segments being examined for
     deletion, and a pair of lists indicating their deletion environment,,
     and returns a function that will count how many times a segment
-    of that class is deleted from an input to an output string."""
-    # Determine the search parameter first
-    # If it's a context-free constraint, just use the segment pattern
-    if lenv == None and renv == None:
-        inp_parameter = segment_pattern
-        out_parameter = segment_pattern
+    of that class is deleted from an input to an output string.
+    Calls with the same arguments, whether given by position or by keyword,
+    return the very same function, so Max constraints can be told apart by
+    identity.
+    If use_re2 is True and the optional re2 module is installed, the
+    patterns are matched with RE2, which runs in linear time no matter the
+    pattern but has more overhead per call on short strings.
+    The input and output can also be given as ASCII bytes, which the regex
+    engine scans a little faster; encode them once beforehand rather than
+    for every constraint."""
+    # RE2 can only be used if it is installed
+    if use_re2 and re2 is None:
+        print("WARNING: re2 is not installed, so Max pattern '{0}' is compiled with re.".format(segment_pattern))
+        use_re2 = False
+    # Always pass all of the arguments in the same way, so that the same
+    # constraint is looked up the same way however it was asked for
+    return _build_max(segment_pattern, lenv, renv, bool(use_re2))
+
+# Since the same constraint is often set up for many tableaux, keep the
+# function built for each combination of segment pattern and environments
+@lru_cache(maxsize=None)
+def _build_max(segment_pattern, lenv, renv, use_re2):
+    """Builds the function returned by GENERIC_MAX for the given arguments."""
+    # Determine the search parameter first, starting from the segment
+    # pattern and adding whichever contexts are given. Between the contexts
+    # and the segment, skip over spaces and tones in the input, and spaces
+    # and epenthetic segments in the output
+    inp_parameter = segment_pattern
+    # Only wrap the segment pattern up if there are contexts to add to it, so
+    # that a pattern on its own can still start with global flags like (?i)
+    if lenv is not None or renv is not None:
+        inp_parameter = f"(?:{segment_pattern})"
+    out_parameter = inp_parameter
     # If there is a preceding context (if you need to scan left)
-    elif lenv != None and renv == None:
-        inp_parameter = "({0})(\s|\d)*({1})".format(lenv, segment_pattern)
-        out_parameter = "({0})(\s|[CV])*({1})".format(lenv, segment_pattern)
-    elif lenv == None and renv != None:
-        inp_parameter = "({0})(\s|\d)*({1})".format(segment_pattern, renv)
-        out_parameter = "({0})(\s|[CV])*({1})".format(segment_pattern, renv)
-    else:
-        inp_parameter = "({0})(\s|\d)*({1})(\s|\d)*({2})".format(lenv, segment_pattern, renv)
-        out_parameter = "({0})(\s|[CV])*({1})(\s|[CV])*({2})".format(lenv, segment_pattern, renv)
-
+    if lenv is not None:
+        inp_parameter = rf"(?:{lenv})(?:\s|\d)*{inp_parameter}"
+        out_parameter = rf"(?:{lenv})(?:\s|[CV])*{out_parameter}"
+    # If there is a following context (if you need to scan right)
+    if renv is not None:
+        inp_parameter += rf"(?:\s|\d)*(?:{renv})"
+        out_parameter += rf"(?:\s|[CV])*(?:{renv})"
+
+    # Compile the patterns once for all of the calls to the function
+    parameters = (inp_parameter, out_parameter, segment_pattern)
+    str_patterns = tuple(_compile_pattern(p, use_re2) for p in parameters)
+    context_free = lenv is None and renv is None
+
+    # Only compile the patterns for bytes the first time bytes are given
+    @lru_cache(maxsize=None)
+    def bytes_patterns():
+        try:
+            return tuple(_compile_pattern(p.encode("ascii"), use_re2) for p in parameters)
+        except UnicodeEncodeError:
+            raise TypeError("Max pattern '{0}' is not ASCII, so it cannot be matched against bytes.".format(inp_parameter)) from None
+
+    # Pick the compiled patterns that match the type of the string given
+    def patterns_for(s):
+        if isinstance(s, str):
+            return str_patterns
+        return bytes_patterns()
+
+    # Every Candidate in a Tableau shares the same input, so scan each input
+    # once and keep its counts for the rest of the Candidates
+    @lru_cache(maxsize=4096)
+    def count_input(inp):
+        inp_pat, _, seg_pat = patterns_for(inp)
+        # First, check to see if the search parameter is present in the input
+        # at all; search stops at the first match
+        if inp_pat.search(inp) is None:
+            return None
+        return len(inp_pat.findall(inp)), _count_segments(seg_pat, inp)
 
     def F(inp, outp):
         # Define default behaviour for empty candidates
-        if outp == "":
+        if not outp:
             return 1
 
-        # First, check to see if the search parameter is present in the input
-        i_matches = re.findall(inp_parameter, inp)
-        if len(i_matches) != 0:
-            # See if you can find all of them in the output
-            o_matches = re.findall(out_parameter, outp)
-            if len(o_matches) == len(i_matches):
-                return 0
-            else:
-                return len(re.findall(segment_pattern, inp)) - len(re.findall(segment_pattern, outp))
+        counts = count_input(inp)
+        if counts is None:
+            return 0
+
+        # Then, see if you can find all of the input's instances in the output
+        i_count, i_segments = counts
+        _, out_pat, seg_pat = patterns_for(outp)
+        o_count = len(out_pat.findall(outp))
+        if o_count == i_count:
+            return 0
+        # Without any contexts, the output pattern matches just the segments,
+        # so the output doesn't need to be scanned again
+        elif context_free:
+            return i_segments - o_count
+        else:
+            return i_segments - _count_segments(seg_pat, outp)
+
+    # A literal segment without contexts can be counted directly, without
+    # going through the regex engine (bytes still use the patterns)
+    if context_free and _is_literal(segment_pattern):
+        match_patterns = F
+        def F(inp, outp):
+            # Define default behaviour for empty candidates, of either type
+            if not outp:
+                return 1
+            if not (isinstance(inp, str) and isinstance(outp, str)):
+                return match_patterns(inp, outp)
+            i_count = inp.count(segment_pattern)
+            return i_count - outp.count(segment_pattern) if i_count else 0
 
-        # Define default behaviour
-        return 0
     return F